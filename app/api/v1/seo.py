@@ -1,12 +1,26 @@
 """SEO analysis routes."""
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
 from app.services.seo_service import SEOService
 from app.services.shopify_service import ShopifyService
-from app.models.schemas import SEOCheckResponse
+from app.services.audit_service import AuditService
+from app.core.database import get_token
+from app.models.schemas import (
+    SEOCheckResponse,
+    ScoreHistoryResponse,
+    AuditDiffResponse,
+    FleetPercentilesResponse,
+)
 
 router = APIRouter(prefix="/seo", tags=["SEO"])
 
 
+def _require_authenticated(shop: str):
+    """Raise 401 if the shop has not installed the app."""
+    if not get_token(shop):
+        raise HTTPException(status_code=401, detail=f"Shop {shop} not authenticated")
+
+
 @router.get("/check", response_model=SEOCheckResponse)
 async def seo_check(shop: str):
     """Analyze theme files for SEO issues."""
@@ -22,3 +36,42 @@ async def seo_check(shop: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.get("/history", response_model=ScoreHistoryResponse)
+async def seo_history(
+    shop: str,
+    granularity: str = Query("run", pattern="^(run|day)$"),
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Score history for a shop, per run or as daily rollups."""
+    _require_authenticated(shop)
+    try:
+        return AuditService.score_history(shop, granularity, since, until, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/diff", response_model=AuditDiffResponse)
+async def seo_diff(
+    shop: str,
+    base_run: Optional[int] = None,
+    head_run: Optional[int] = None
+):
+    """Per-asset check changes between two runs (defaults to the latest two)."""
+    _require_authenticated(shop)
+    try:
+        return AuditService.diff_runs(shop, base_run, head_run)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/percentiles", response_model=FleetPercentilesResponse)
+async def seo_percentiles(shop: str, p: List[float] = Query([50, 90, 99])):
+    """Fleet-wide percentiles of each shop's latest overall score."""
+    _require_authenticated(shop)
+    try:
+        return AuditService.fleet_percentiles(p)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,8 +1,79 @@
 """Database connection and helper functions."""
+import re
 import sqlite3
-from typing import Optional
+import time
+from typing import Dict, List, Optional, Tuple
 from app.config import settings
 
+# Severity codes stored for each audit check, keyed by result field
+CHECK_SEVERITIES = (
+    ("issues", 0),
+    ("warnings", 1),
+    ("checks_passed", 2),
+)
+
+AUDIT_SCHEMA = (
+    # One summary row per /seo/check run
+    """CREATE TABLE IF NOT EXISTS audit_runs (
+        id INTEGER PRIMARY KEY,
+        shop TEXT NOT NULL,
+        theme_id TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        files_analyzed INTEGER NOT NULL,
+        overall_score REAL NOT NULL,
+        total_issues INTEGER NOT NULL,
+        total_warnings INTEGER NOT NULL,
+        total_passed INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_audit_runs_shop_created "
+    "ON audit_runs (shop, created_at)",
+    # Interned asset keys and check codes keep the per-asset rows small
+    """CREATE TABLE IF NOT EXISTS asset_keys (
+        id INTEGER PRIMARY KEY,
+        asset_key TEXT NOT NULL UNIQUE
+    )""",
+    """CREATE TABLE IF NOT EXISTS check_codes (
+        id INTEGER PRIMARY KEY,
+        severity INTEGER NOT NULL,
+        code TEXT NOT NULL,
+        UNIQUE (severity, code)
+    )""",
+    """CREATE TABLE IF NOT EXISTS audit_assets (
+        run_id INTEGER NOT NULL,
+        asset_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (run_id, asset_id)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS audit_checks (
+        run_id INTEGER NOT NULL,
+        asset_id INTEGER NOT NULL,
+        check_id INTEGER NOT NULL,
+        PRIMARY KEY (run_id, asset_id, check_id)
+    ) WITHOUT ROWID""",
+    # Rollups maintained on insert so trend queries never rescan runs
+    """CREATE TABLE IF NOT EXISTS audit_daily (
+        shop TEXT NOT NULL,
+        day INTEGER NOT NULL,
+        runs INTEGER NOT NULL,
+        score_sum REAL NOT NULL,
+        score_min REAL NOT NULL,
+        score_max REAL NOT NULL,
+        last_score REAL NOT NULL,
+        last_created_at INTEGER NOT NULL,
+        PRIMARY KEY (shop, day)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS shop_latest_scores (
+        shop TEXT PRIMARY KEY,
+        run_id INTEGER NOT NULL,
+        created_at INTEGER NOT NULL,
+        overall_score REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS score_histogram (
+        bucket INTEGER PRIMARY KEY,
+        shops INTEGER NOT NULL
+    )""",
+)
+
 
 def init_db():
     """Initialize the database with required tables."""
@@ -11,6 +82,8 @@ def init_db():
     c.execute(
         "CREATE TABLE IF NOT EXISTS sessions (shop TEXT PRIMARY KEY, token TEXT)"
     )
+    for statement in AUDIT_SCHEMA:
+        c.execute(statement)
     conn.commit()
     conn.close()
 
@@ -36,3 +109,257 @@ def get_token(shop: str) -> Optional[str]:
     conn.close()
     return row[0] if row else None
 
+
+def check_code(message: str) -> str:
+    """Reduce a check message to a stable code by masking standalone numbers."""
+    return re.sub(r"\b\d+(\.\d+)?\b", "#", message)
+
+
+def score_bucket(score: float) -> int:
+    """Map a 0-100 score to its histogram bucket (hundredths of a point)."""
+    return max(0, min(10000, round(score * 100)))
+
+
+def _intern(c: sqlite3.Cursor, table: str, column: str, value: str) -> int:
+    """Return the id for value in a lookup table, inserting it if new."""
+    c.execute(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", (value,))
+    c.execute(f"SELECT id FROM {table} WHERE {column}=?", (value,))
+    return c.fetchone()[0]
+
+
+def _intern_check(c: sqlite3.Cursor, severity: int, code: str) -> int:
+    """Return the id for a check code, inserting it if new."""
+    c.execute(
+        "INSERT OR IGNORE INTO check_codes (severity, code) VALUES (?, ?)",
+        (severity, code)
+    )
+    c.execute(
+        "SELECT id FROM check_codes WHERE severity=? AND code=?",
+        (severity, code)
+    )
+    return c.fetchone()[0]
+
+
+def _update_rollups(
+    c: sqlite3.Cursor, shop: str, run_id: int, created_at: int, score: float
+):
+    """Fold a new run into the daily and fleet-wide rollup tables."""
+    c.execute(
+        """INSERT INTO audit_daily
+            (shop, day, runs, score_sum, score_min, score_max, last_score,
+             last_created_at)
+        VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+        ON CONFLICT (shop, day) DO UPDATE SET
+            runs = runs + 1,
+            score_sum = score_sum + excluded.score_sum,
+            score_min = MIN(score_min, excluded.score_min),
+            score_max = MAX(score_max, excluded.score_max),
+            last_score = CASE WHEN excluded.last_created_at >= last_created_at
+                THEN excluded.last_score ELSE last_score END,
+            last_created_at = MAX(last_created_at, excluded.last_created_at)""",
+        (shop, created_at // 86400, score, score, score, score, created_at)
+    )
+
+    c.execute(
+        "SELECT created_at, overall_score FROM shop_latest_scores WHERE shop=?",
+        (shop,)
+    )
+    previous = c.fetchone()
+    if previous and previous[0] > created_at:
+        return
+    if previous:
+        c.execute(
+            "UPDATE score_histogram SET shops = shops - 1 WHERE bucket=?",
+            (score_bucket(previous[1]),)
+        )
+    c.execute(
+        """INSERT INTO score_histogram (bucket, shops) VALUES (?, 1)
+        ON CONFLICT (bucket) DO UPDATE SET shops = shops + 1""",
+        (score_bucket(score),)
+    )
+    c.execute(
+        """INSERT OR REPLACE INTO shop_latest_scores
+            (shop, run_id, created_at, overall_score)
+        VALUES (?, ?, ?, ?)""",
+        (shop, run_id, created_at, score)
+    )
+
+
+def save_audit_run(
+    shop: str,
+    theme_id: str,
+    overall_score: float,
+    summary: Dict,
+    results: List[Dict],
+    created_at: Optional[int] = None
+) -> int:
+    """Persist an SEO check result and update rollups. Returns the run id."""
+    if created_at is None:
+        created_at = int(time.time())
+
+    conn = sqlite3.connect(settings.database_url)
+    try:
+        with conn:
+            c = conn.cursor()
+            c.execute(
+                """INSERT INTO audit_runs
+                    (shop, theme_id, created_at, files_analyzed, overall_score,
+                     total_issues, total_warnings, total_passed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    shop, str(theme_id), created_at, len(results), overall_score,
+                    summary.get("total_issues", 0),
+                    summary.get("total_warnings", 0),
+                    summary.get("total_passed", 0)
+                )
+            )
+            run_id = c.lastrowid
+
+            for result in results:
+                asset_id = _intern(
+                    c, "asset_keys", "asset_key", result["asset_key"]
+                )
+                c.execute(
+                    "INSERT OR REPLACE INTO audit_assets (run_id, asset_id, score) "
+                    "VALUES (?, ?, ?)",
+                    (run_id, asset_id, result.get("score", 0.0))
+                )
+                checks = [
+                    (run_id, asset_id, _intern_check(c, severity, check_code(msg)))
+                    for field, severity in CHECK_SEVERITIES
+                    for msg in result.get(field, [])
+                ]
+                c.executemany(
+                    "INSERT OR IGNORE INTO audit_checks (run_id, asset_id, check_id) "
+                    "VALUES (?, ?, ?)",
+                    checks
+                )
+
+            _update_rollups(c, shop, run_id, created_at, overall_score)
+    finally:
+        conn.close()
+    return run_id
+
+
+RUN_COLUMNS = (
+    "id", "shop", "theme_id", "created_at", "files_analyzed", "overall_score",
+    "total_issues", "total_warnings", "total_passed"
+)
+
+# History and diff queries, kept at module level so their plans can be checked
+RUN_HISTORY_SQL = (
+    f"SELECT {', '.join(RUN_COLUMNS)} FROM audit_runs "
+    "WHERE shop=? AND created_at >= ? AND created_at <= ? "
+    "ORDER BY created_at DESC, id DESC LIMIT ?"
+)
+DAILY_HISTORY_SQL = (
+    "SELECT day, runs, score_sum, score_min, score_max, last_score "
+    "FROM audit_daily WHERE shop=? AND day >= ? AND day <= ? "
+    "ORDER BY day DESC LIMIT ?"
+)
+RUN_ASSETS_SQL = (
+    "SELECT k.asset_key, a.score FROM audit_assets a "
+    "JOIN asset_keys k ON k.id = a.asset_id WHERE a.run_id=?"
+)
+RUN_CHECKS_SQL = (
+    "SELECT k.asset_key, cc.severity, cc.code FROM audit_checks ac "
+    "JOIN asset_keys k ON k.id = ac.asset_id "
+    "JOIN check_codes cc ON cc.id = ac.check_id WHERE ac.run_id=?"
+)
+
+
+def get_audit_run(run_id: int) -> Optional[Dict]:
+    """Retrieve a single audit run summary."""
+    conn = sqlite3.connect(settings.database_url)
+    c = conn.cursor()
+    c.execute(
+        f"SELECT {', '.join(RUN_COLUMNS)} FROM audit_runs WHERE id=?",
+        (run_id,)
+    )
+    row = c.fetchone()
+    conn.close()
+    return dict(zip(RUN_COLUMNS, row)) if row else None
+
+
+def get_audit_runs(
+    shop: str,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    limit: int = 100
+) -> List[Dict]:
+    """Retrieve a shop's audit run summaries, newest first."""
+    conn = sqlite3.connect(settings.database_url)
+    c = conn.cursor()
+    c.execute(
+        RUN_HISTORY_SQL,
+        (
+            shop,
+            since if since is not None else 0,
+            until if until is not None else 2 ** 62,
+            limit
+        )
+    )
+    rows = c.fetchall()
+    conn.close()
+    return [dict(zip(RUN_COLUMNS, row)) for row in rows]
+
+
+def get_daily_scores(
+    shop: str,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    limit: int = 100
+) -> List[Dict]:
+    """Retrieve a shop's pre-aggregated daily scores, newest first."""
+    conn = sqlite3.connect(settings.database_url)
+    c = conn.cursor()
+    c.execute(
+        DAILY_HISTORY_SQL,
+        (
+            shop,
+            since // 86400 if since is not None else 0,
+            until // 86400 if until is not None else 2 ** 62,
+            limit
+        )
+    )
+    rows = c.fetchall()
+    conn.close()
+    return [
+        {
+            "day": day * 86400,
+            "runs": runs,
+            "average_score": round(score_sum / runs, 2),
+            "min_score": score_min,
+            "max_score": score_max,
+            "last_score": last_score
+        }
+        for day, runs, score_sum, score_min, score_max, last_score in rows
+    ]
+
+
+def get_audit_checks(run_id: int) -> Dict[str, Tuple[float, List[Tuple[int, str]]]]:
+    """Retrieve per-asset scores and check codes for a run."""
+    conn = sqlite3.connect(settings.database_url)
+    c = conn.cursor()
+    c.execute(RUN_ASSETS_SQL, (run_id,))
+    assets = {key: (score, []) for key, score in c.fetchall()}
+    c.execute(RUN_CHECKS_SQL, (run_id,))
+    for key, severity, code in c.fetchall():
+        assets[key][1].append((severity, code))
+    conn.close()
+    return assets
+
+
+def get_score_histogram() -> List[Tuple[int, int]]:
+    """Retrieve the fleet-wide histogram of each shop's latest score.
+    
+    Buckets are scores in hundredths of a point, matching score rounding.
+    """
+    conn = sqlite3.connect(settings.database_url)
+    c = conn.cursor()
+    c.execute(
+        "SELECT bucket, shops FROM score_histogram WHERE shops > 0 ORDER BY bucket"
+    )
+    rows = c.fetchall()
+    conn.close()
+    return rows
@@ -1,6 +1,6 @@
 """Pydantic schemas for request/response validation."""
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 
 
 class AuthCallbackResponse(BaseModel):
@@ -33,4 +33,67 @@ class SEOCheckResponse(BaseModel):
     overall_score: float
     summary: dict
     results: List[SEOIssue]
+    run_id: Optional[int] = None
+
+
+class AuditRunSummary(BaseModel):
+    """Stored summary of a single SEO check run."""
+    id: int
+    shop: str
+    theme_id: str
+    created_at: int
+    files_analyzed: int
+    overall_score: float
+    total_issues: int
+    total_warnings: int
+    total_passed: int
+
+
+class DailyScore(BaseModel):
+    """Pre-aggregated SEO scores for one UTC day."""
+    day: int
+    runs: int
+    average_score: float
+    min_score: float
+    max_score: float
+    last_score: float
+
+
+class ScoreHistoryResponse(BaseModel):
+    """Response model for a shop's score history."""
+    shop: str
+    granularity: str
+    points: List[Union[AuditRunSummary, DailyScore]]
+
+
+class CheckCodes(BaseModel):
+    """Check codes grouped by severity."""
+    issues: List[str] = []
+    warnings: List[str] = []
+    checks_passed: List[str] = []
+
+
+class AssetDiff(BaseModel):
+    """Changes to a single asset between two runs."""
+    asset_key: str
+    status: str
+    base_score: Optional[float] = None
+    head_score: Optional[float] = None
+    added: CheckCodes
+    resolved: CheckCodes
+
+
+class AuditDiffResponse(BaseModel):
+    """Response model for a diff between two runs."""
+    shop: str
+    base_run: AuditRunSummary
+    head_run: AuditRunSummary
+    score_delta: float
+    assets: List[AssetDiff]
+
+
+class FleetPercentilesResponse(BaseModel):
+    """Response model for fleet-wide score percentiles."""
+    shops: int
+    percentiles: Dict[str, Optional[float]]
 
@@ -0,0 +1,129 @@
+"""Service for querying stored SEO audit history."""
+import math
+from typing import Dict, List, Optional
+from app.core import database
+
+SEVERITY_FIELDS = {
+    severity: field for field, severity in database.CHECK_SEVERITIES
+}
+
+
+class AuditService:
+    """Service for score trends, run diffs and fleet-wide statistics."""
+    
+    @staticmethod
+    def score_history(
+        shop: str,
+        granularity: str = "run",
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        limit: int = 100
+    ) -> Dict:
+        """Return a shop's score history per run or per day."""
+        if granularity == "day":
+            points = database.get_daily_scores(shop, since, until, limit)
+        elif granularity == "run":
+            points = database.get_audit_runs(shop, since, until, limit)
+        else:
+            raise ValueError(f"Unknown granularity '{granularity}'")
+        
+        return {"shop": shop, "granularity": granularity, "points": points}
+    
+    @staticmethod
+    def diff_runs(
+        shop: str,
+        base_run_id: Optional[int] = None,
+        head_run_id: Optional[int] = None
+    ) -> Dict:
+        """Compare per-asset check codes between two runs of a shop.
+        
+        Defaults to the shop's two most recent runs.
+        """
+        if base_run_id is None or head_run_id is None:
+            latest = [run["id"] for run in database.get_audit_runs(shop, limit=2)]
+            if len(latest) < 2:
+                raise LookupError(f"Shop {shop} has fewer than two audit runs")
+            head_run_id = head_run_id if head_run_id is not None else latest[0]
+            base_run_id = base_run_id if base_run_id is not None else latest[1]
+        
+        base_run = database.get_audit_run(base_run_id)
+        head_run = database.get_audit_run(head_run_id)
+        for run_id, run in ((base_run_id, base_run), (head_run_id, head_run)):
+            if not run or run["shop"] != shop:
+                raise LookupError(f"Audit run {run_id} not found for shop {shop}")
+        
+        base_assets = database.get_audit_checks(base_run_id)
+        head_assets = database.get_audit_checks(head_run_id)
+        
+        assets = []
+        for asset_key in sorted(set(base_assets) | set(head_assets)):
+            base_score, base_checks = base_assets.get(asset_key, (None, []))
+            head_score, head_checks = head_assets.get(asset_key, (None, []))
+            added = set(head_checks) - set(base_checks)
+            resolved = set(base_checks) - set(head_checks)
+            if not added and not resolved and base_score == head_score:
+                continue
+            
+            if base_score is None:
+                status = "added"
+            elif head_score is None:
+                status = "removed"
+            else:
+                status = "changed"
+            
+            assets.append({
+                "asset_key": asset_key,
+                "status": status,
+                "base_score": base_score,
+                "head_score": head_score,
+                "added": AuditService._group_checks(added),
+                "resolved": AuditService._group_checks(resolved)
+            })
+        
+        return {
+            "shop": shop,
+            "base_run": base_run,
+            "head_run": head_run,
+            "score_delta": round(
+                head_run["overall_score"] - base_run["overall_score"], 2
+            ),
+            "assets": assets
+        }
+    
+    @staticmethod
+    def fleet_percentiles(percentiles: List[float]) -> Dict:
+        """Return nearest-rank percentiles of every shop's latest score.
+        
+        Scores are bucketed to hundredths of a point in the rollup table,
+        the same precision they are rounded to, so the answer is exact and
+        independent of how many runs have been stored.
+        """
+        for p in percentiles:
+            if not 0 <= p <= 100:
+                raise ValueError(f"Percentile {p} must be between 0 and 100")
+        
+        histogram = database.get_score_histogram()
+        total = sum(shops for _, shops in histogram)
+        
+        values = {}
+        for p in percentiles:
+            if total == 0:
+                values[f"{p:g}"] = None
+                continue
+            rank = max(1, math.ceil(p / 100 * total))
+            seen = 0
+            for bucket, shops in histogram:
+                seen += shops
+                if seen >= rank:
+                    values[f"{p:g}"] = bucket / 100
+                    break
+        
+        return {"shops": total, "percentiles": values}
+    
+    @staticmethod
+    def _group_checks(checks) -> Dict[str, List[str]]:
+        """Group (severity, code) pairs by result field name."""
+        grouped = {field: [] for field in SEVERITY_FIELDS.values()}
+        for severity, code in sorted(checks):
+            grouped[SEVERITY_FIELDS[severity]].append(code)
+        return grouped
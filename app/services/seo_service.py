@@ -1,8 +1,13 @@
 """Service for SEO analysis."""
+import logging
 import re
+import sqlite3
 from typing import Dict, List
 from bs4 import BeautifulSoup
 from app.services.shopify_service import ShopifyService
+from app.core.database import save_audit_run
+
+logger = logging.getLogger(__name__)
 
 
 class SEOService:
@@ -189,16 +194,30 @@ class SEOService:
         total_checks = total_issues + total_warnings + total_passed
         overall_score = (total_passed / total_checks * 100) if total_checks > 0 else 0
         
+        summary = {
+            "total_issues": total_issues,
+            "total_warnings": total_warnings,
+            "total_passed": total_passed
+        }
+        overall_score = round(overall_score, 2)
+        
+        # Persist the run so score trends can be queried later; a storage
+        # failure must not cost the caller the audit result
+        try:
+            run_id = save_audit_run(
+                shop, theme_id, overall_score, summary, results
+            )
+        except sqlite3.Error:
+            logger.exception("Failed to save SEO audit run for %s", shop)
+            run_id = None
+        
         return {
             "shop": shop,
             "theme_id": theme_id,
             "files_analyzed": len(results),
-            "overall_score": round(overall_score, 2),
-            "summary": {
-                "total_issues": total_issues,
-                "total_warnings": total_warnings,
-                "total_passed": total_passed
-            },
-            "results": results
+            "overall_score": overall_score,
+            "summary": summary,
+            "results": results,
+            "run_id": run_id
         }
 
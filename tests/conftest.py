@@ -0,0 +1,20 @@
+"""Shared pytest fixtures."""
+import os
+
+# Settings are loaded at import time and require the Shopify credentials
+os.environ.setdefault("SHOPIFY_API_KEY", "test-key")
+os.environ.setdefault("SHOPIFY_API_SECRET", "test-secret")
+os.environ.setdefault("APP_URL", "http://localhost:8000")
+
+import pytest
+from app.config import settings
+from app.core.database import init_db
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Point the app at a fresh, initialized SQLite database."""
+    path = str(tmp_path / "test.db")
+    monkeypatch.setattr(settings, "database_url", path)
+    init_db()
+    return path
@@ -0,0 +1,189 @@
+"""Tests for SEO audit history storage and queries."""
+import asyncio
+import sqlite3
+
+import pytest
+from app.core import database
+from app.core.database import check_code, get_daily_scores, save_audit_run
+from app.services.audit_service import AuditService
+from app.services.seo_service import SEOService
+
+DAY = 86400
+
+
+def _result(asset_key, score, issues=(), warnings=(), checks_passed=()):
+    return {
+        "asset_key": asset_key,
+        "issues": list(issues),
+        "warnings": list(warnings),
+        "checks_passed": list(checks_passed),
+        "score": score
+    }
+
+
+def _save(shop, score, results=(), created_at=DAY):
+    return save_audit_run(shop, "1", score, {}, list(results), created_at)
+
+
+def _plan(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", (1,) * sql.count("?"))
+    details = [row[3] for row in rows]
+    conn.close()
+    return details
+
+
+def test_check_code_masks_only_standalone_numbers():
+    assert check_code("No H1 tag found") == "No H1 tag found"
+    assert check_code("Single H1 tag found (good)") == "Single H1 tag found (good)"
+    assert (
+        check_code("Title tag is too long (72 chars, recommended: 50-60)")
+        == "Title tag is too long (# chars, recommended: #-#)"
+    )
+    assert check_code("2/3 images have alt text") == "#/# images have alt text"
+
+
+def test_diff_between_two_runs(db_path):
+    base = _save("a.myshopify.com", 40.0, [
+        _result(
+            "layout/theme.liquid", 33.33,
+            issues=["No H1 tag found"],
+            warnings=["Title tag is too long (72 chars, recommended: 50-60)"],
+            checks_passed=["Viewport meta tag found"]
+        ),
+        _result("templates/old.liquid", 50.0, checks_passed=["Canonical URL found"])
+    ], created_at=DAY)
+    head = _save("a.myshopify.com", 75.0, [
+        _result(
+            "layout/theme.liquid", 66.67,
+            warnings=["Title tag is too long (75 chars, recommended: 50-60)"],
+            checks_passed=["Viewport meta tag found", "Single H1 tag found (good)"]
+        ),
+        _result("templates/index.liquid", 100.0, checks_passed=["Canonical URL found"])
+    ], created_at=2 * DAY)
+
+    diff = AuditService.diff_runs("a.myshopify.com")
+
+    assert diff["base_run"]["id"] == base
+    assert diff["head_run"]["id"] == head
+    assert diff["score_delta"] == 35.0
+    assets = {asset["asset_key"]: asset for asset in diff["assets"]}
+    assert set(assets) == {
+        "layout/theme.liquid", "templates/index.liquid", "templates/old.liquid"
+    }
+
+    theme = assets["layout/theme.liquid"]
+    assert theme["status"] == "changed"
+    assert theme["resolved"]["issues"] == ["No H1 tag found"]
+    assert theme["added"]["checks_passed"] == ["Single H1 tag found (good)"]
+    # Same warning with a different number is the same check
+    assert theme["added"]["warnings"] == []
+    assert theme["resolved"]["warnings"] == []
+
+    assert assets["templates/index.liquid"]["status"] == "added"
+    assert assets["templates/old.liquid"]["status"] == "removed"
+
+
+def test_diff_rejects_runs_from_another_shop(db_path):
+    _save("a.myshopify.com", 40.0)
+    other = _save("b.myshopify.com", 50.0)
+    latest = _save("a.myshopify.com", 60.0, created_at=2 * DAY)
+
+    with pytest.raises(LookupError):
+        AuditService.diff_runs("a.myshopify.com", other, latest)
+    with pytest.raises(LookupError):
+        AuditService.diff_runs("b.myshopify.com")
+
+
+def test_histogram_moves_shop_between_buckets(db_path):
+    _save("a.myshopify.com", 40.0, created_at=DAY)
+    _save("b.myshopify.com", 99.9, created_at=DAY)
+    assert database.get_score_histogram() == [(4000, 1), (9990, 1)]
+
+    _save("a.myshopify.com", 72.35, created_at=2 * DAY)
+    assert database.get_score_histogram() == [(7235, 1), (9990, 1)]
+
+    # A backfilled older run does not replace the shop's latest score
+    _save("a.myshopify.com", 10.0, created_at=DAY // 2)
+    assert database.get_score_histogram() == [(7235, 1), (9990, 1)]
+
+
+def test_daily_rollups(db_path):
+    _save("a.myshopify.com", 30.0, created_at=DAY + 100)
+    _save("a.myshopify.com", 50.0, created_at=DAY + 2000)
+    _save("a.myshopify.com", 20.0, created_at=DAY + 1500)
+    _save("a.myshopify.com", 80.0, created_at=2 * DAY + 10)
+
+    days = get_daily_scores("a.myshopify.com")
+
+    assert [d["day"] for d in days] == [2 * DAY, DAY]
+    assert days[1] == {
+        "day": DAY,
+        "runs": 3,
+        "average_score": 33.33,
+        "min_score": 20.0,
+        "max_score": 50.0,
+        "last_score": 50.0
+    }
+    assert days[0]["runs"] == 1
+    assert days[0]["last_score"] == 80.0
+
+
+def test_percentiles_empty_fleet(db_path):
+    assert AuditService.fleet_percentiles([0, 50, 100]) == {
+        "shops": 0,
+        "percentiles": {"0": None, "50": None, "100": None}
+    }
+
+
+def test_percentiles_bounds_and_precision(db_path):
+    for i, score in enumerate([10.0, 55.5, 72.25, 99.9]):
+        _save(f"shop{i}.myshopify.com", score)
+
+    result = AuditService.fleet_percentiles([0, 50, 75, 100])
+
+    assert result["shops"] == 4
+    assert result["percentiles"] == {
+        "0": 10.0, "50": 55.5, "75": 72.25, "100": 99.9
+    }
+
+
+def test_percentiles_reject_out_of_range(db_path):
+    with pytest.raises(ValueError):
+        AuditService.fleet_percentiles([101])
+
+
+def test_history_and_diff_queries_use_indexes(db_path):
+    assert _plan(db_path, database.RUN_HISTORY_SQL) == [
+        "SEARCH audit_runs USING INDEX idx_audit_runs_shop_created "
+        "(shop=? AND created_at>? AND created_at<?)"
+    ]
+    assert _plan(db_path, database.DAILY_HISTORY_SQL) == [
+        "SEARCH audit_daily USING PRIMARY KEY (shop=? AND day>? AND day<?)"
+    ]
+    for sql in (database.RUN_ASSETS_SQL, database.RUN_CHECKS_SQL):
+        plan = _plan(db_path, sql)
+        assert plan[0].endswith("USING PRIMARY KEY (run_id=?)")
+        assert all("USING" in step and "SCAN" not in step for step in plan)
+
+
+def test_check_seo_survives_storage_failure(db_path, monkeypatch):
+    class FakeShopifyService:
+        async def get_active_theme_id(self):
+            return "1"
+
+        async def list_theme_assets(self, theme_id):
+            return [{"key": "layout/theme.liquid"}]
+
+        async def get_theme_asset(self, theme_id, asset_key):
+            return "<html><head><title>Shop</title></head></html>"
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr("app.services.seo_service.save_audit_run", locked)
+
+    result = asyncio.run(SEOService(FakeShopifyService()).check_seo("a.myshopify.com"))
+
+    assert result["run_id"] is None
+    assert result["files_analyzed"] == 1